@@ -103,96 +103,72 @@ check_prerequisites() {
     fi
 }
 
-# Deploy Lambda functions
-deploy_lambda_functions() {
-    log_header "Deploying Lambda Functions"
-    
-    # Create temporary directory
-    TEMP_DIR="/tmp/multiagent_deploy_$$"
-    mkdir -p $TEMP_DIR
-    trap "rm -rf $TEMP_DIR" EXIT
-    
-    # Deploy Orchestrator
-    log_info "Deploying Orchestrator Lambda..."
-    cd $TEMP_DIR
-    cp ~/hackathon/aws-ai-agent/infrastructure/lambda/orchestration/orchestrator_handler.py handler.py
-    
-    if [ -f ~/hackathon/aws-ai-agent/infrastructure/lambda/realtime/status_utils.py ]; then
-        cp ~/hackathon/aws-ai-agent/infrastructure/lambda/realtime/status_utils.py .
-    fi
-    
-    zip -q deployment.zip handler.py status_utils.py 2>/dev/null || zip -q deployment.zip handler.py
-    
-    if aws lambda get-function --function-name $ORCHESTRATOR_FUNCTION --region $REGION &> /dev/null; then
-        aws lambda update-function-code \
-            --function-name $ORCHESTRATOR_FUNCTION \
-            --zip-file fileb://deployment.zip \
-            --region $REGION \
-            --no-cli-pager > /dev/null
-        
-        aws lambda wait function-updated \
-            --function-name $ORCHESTRATOR_FUNCTION \
-            --region $REGION
-        
-        log_success "Orchestrator updated"
-    else
-        log_warning "Orchestrator function not found, skipping..."
-    fi
-    
-    # Deploy Ingest Handler
-    log_info "Deploying Ingest Handler..."
-    cd $TEMP_DIR
-    rm -f *.zip *.py
-    cp ~/hackathon/aws-ai-agent/infrastructure/lambda/orchestration/ingest_handler_with_orchestrator.py ingest_handler_simple.py
+# Package and deploy a single Lambda handler
+# Usage: deploy_function <label> <source file> <handler file name> <function name>
+deploy_function() {
+    local LABEL=$1
+    local SOURCE=$2
+    local HANDLER_FILE=$3
+    local FUNCTION_NAME=$4
+    local WORK_DIR="$TEMP_DIR/$FUNCTION_NAME"
+    
+    mkdir -p $WORK_DIR
+    cd $WORK_DIR
+    cp $SOURCE $HANDLER_FILE
     
     if [ -f ~/hackathon/aws-ai-agent/infrastructure/lambda/realtime/status_utils.py ]; then
         cp ~/hackathon/aws-ai-agent/infrastructure/lambda/realtime/status_utils.py .
     fi
     
-    zip -q deployment.zip ingest_handler_simple.py status_utils.py 2>/dev/null || zip -q deployment.zip ingest_handler_simple.py
+    zip -q -1 deployment.zip $HANDLER_FILE status_utils.py 2>/dev/null || zip -q -1 deployment.zip $HANDLER_FILE
     
-    if aws lambda get-function --function-name $INGEST_FUNCTION --region $REGION &> /dev/null; then
+    if aws lambda get-function --function-name $FUNCTION_NAME --region $REGION &> /dev/null; then
         aws lambda update-function-code \
-            --function-name $INGEST_FUNCTION \
+            --function-name $FUNCTION_NAME \
             --zip-file fileb://deployment.zip \
             --region $REGION \
             --no-cli-pager > /dev/null
         
         aws lambda wait function-updated \
-            --function-name $INGEST_FUNCTION \
+            --function-name $FUNCTION_NAME \
             --region $REGION
         
-        log_success "Ingest Handler updated"
+        log_success "$LABEL updated"
     else
-        log_warning "Ingest Handler function not found, skipping..."
+        log_warning "$LABEL function not found, skipping..."
     fi
+}
+
+# Deploy Lambda functions
+deploy_lambda_functions() {
+    log_header "Deploying Lambda Functions"
     
-    # Deploy Query Handler
-    log_info "Deploying Query Handler..."
-    cd $TEMP_DIR
-    rm -f *.zip *.py
-    cp ~/hackathon/aws-ai-agent/infrastructure/lambda/orchestration/query_index.py query_handler_simple.py
-    
-    if [ -f ~/hackathon/aws-ai-agent/infrastructure/lambda/realtime/status_utils.py ]; then
-        cp ~/hackathon/aws-ai-agent/infrastructure/lambda/realtime/status_utils.py .
-    fi
+    # Create temporary directory
+    TEMP_DIR="/tmp/multiagent_deploy_$$"
+    mkdir -p $TEMP_DIR
+    trap "rm -rf $TEMP_DIR" EXIT
     
-    zip -q deployment.zip query_handler_simple.py status_utils.py 2>/dev/null || zip -q deployment.zip query_handler_simple.py
+    # The three updates are independent and mostly spent in "aws lambda wait",
+    # so run them concurrently, each in its own working directory
+    log_info "Deploying Orchestrator, Ingest Handler and Query Handler..."
+    LAMBDA_SRC=~/hackathon/aws-ai-agent/infrastructure/lambda
+    PIDS=()
+    
+    deploy_function "Orchestrator" $LAMBDA_SRC/orchestration/orchestrator_handler.py handler.py $ORCHESTRATOR_FUNCTION &
+    PIDS+=($!)
+    deploy_function "Ingest Handler" $LAMBDA_SRC/orchestration/ingest_handler_with_orchestrator.py ingest_handler_simple.py $INGEST_FUNCTION &
+    PIDS+=($!)
+    deploy_function "Query Handler" $LAMBDA_SRC/orchestration/query_index.py query_handler_simple.py $QUERY_FUNCTION &
+    PIDS+=($!)
+    
+    FAILED=0
+    for PID in "${PIDS[@]}"; do
+        wait $PID || FAILED=1
+    done
     
-    if aws lambda get-function --function-name $QUERY_FUNCTION --region $REGION &> /dev/null; then
-        aws lambda update-function-code \
-            --function-name $QUERY_FUNCTION \
-            --zip-file fileb://deployment.zip \
-            --region $REGION \
-            --no-cli-pager > /dev/null
-        
-        aws lambda wait function-updated \
-            --function-name $QUERY_FUNCTION \
-            --region $REGION
-        
-        log_success "Query Handler updated"
-    else
-        log_warning "Query Handler function not found, skipping..."
+    if [ $FAILED -ne 0 ]; then
+        log_error "One or more Lambda deployments failed"
+        exit 1
     fi
     
     # Cleanup
@@ -221,8 +197,8 @@ verify_deployment() {
     FUNCTIONS=("$CONFIG_FUNCTION" "$INGEST_FUNCTION" "$QUERY_FUNCTION" "$ORCHESTRATOR_FUNCTION")
     
     for FUNC in "${FUNCTIONS[@]}"; do
-        if aws lambda get-function --function-name $FUNC --region $REGION &> /dev/null; then
-            LAST_MODIFIED=$(aws lambda get-function-configuration --function-name $FUNC --region $REGION --query 'LastModified' --output text)
+        # One call both checks existence and returns the timestamp
+        if LAST_MODIFIED=$(aws lambda get-function-configuration --function-name $FUNC --region $REGION --query 'LastModified' --output text 2>/dev/null); then
             log_success "$FUNC (Updated: $LAST_MODIFIED)"
         else
             log_warning "$FUNC not found"
@@ -422,9 +398,6 @@ main() {
     check_prerequisites
     deploy_lambda_functions
     
-    log_info "Waiting 10 seconds for functions to stabilize..."
-    sleep 10
-    
     verify_deployment
     test_apis
     display_summary
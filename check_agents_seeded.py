@@ -1,112 +1,91 @@
 #!/usr/bin/env python3
-"""Check if builtin agents are seeded in the database"""
+"""Check if builtin agents are seeded in the database
+
+Requires boto3 and psycopg2 (pip3 install boto3 psycopg2-binary). Both are
+imported lazily so importing this module stays cheap until the check runs.
+"""
 import json
-import os
 import sys
 
-try:
-    import boto3
-    import psycopg2
-except ImportError as e:
-    print(f"Missing dependency: {e}")
-    print("Installing dependencies...")
-    os.system("pip3 install boto3 psycopg2-binary --quiet")
-    import boto3
-    import psycopg2
+# Secret values by ARN, kept for the life of the process so repeated checks
+# (e.g. when main() is called from a test harness) skip Secrets Manager
+_secret_cache = {}
 
-def main():
-    try:
-        # Get database credentials from CloudFormation
-        cfn = boto3.client('cloudformation', region_name='us-east-1')
-        response = cfn.describe_stacks(StackName='MultiAgentOrchestration-dev-Data')
-        outputs = {o['OutputKey']: o['OutputValue'] for o in response['Stacks'][0]['Outputs']}
-        
-        secret_arn = outputs['DatabaseSecretArn']
-        db_host = outputs['DatabaseEndpoint']
-        
-        # Get database password
-        secrets = boto3.client('secretsmanager', region_name='us-east-1')
+
+def get_db_credentials(secrets, secret_arn):
+    """Return the database credentials stored in secret_arn, cached in-process"""
+    creds = _secret_cache.get(secret_arn)
+    if creds is None:
         secret_response = secrets.get_secret_value(SecretId=secret_arn)
         creds = json.loads(secret_response['SecretString'])
-        
-        # Connect to database
-        conn = psycopg2.connect(
+        _secret_cache[secret_arn] = creds
+    return creds
+
+
+# Connection pools keyed by (host, user) so repeated checks reuse an open
+# connection instead of paying TCP + TLS + auth on every call
+_pools = {}
+
+
+def get_pool(db_host, creds):
+    """Return a connection pool for db_host, creating it on first use"""
+    key = (db_host, creds['username'])
+    pool = _pools.get(key)
+    if pool is None:
+        from psycopg2.pool import ThreadedConnectionPool
+        
+        pool = ThreadedConnectionPool(
+            1, 5,
             host=db_host,
             port=5432,
             database='multi_agent_orchestration',
             user=creds['username'],
             password=creds['password']
         )
-        cursor = conn.cursor()
-        
-        # Check agents
-        print("\n" + "="*80)
-        print("BUILTIN AGENTS CHECK")
-        print("="*80)
-        
-        cursor.execute("""
-            SELECT agent_id, agent_name, agent_class, is_inbuilt, enabled
-            FROM agent_definitions
-            WHERE is_inbuilt = true
-            ORDER BY agent_class, agent_id
-        """)
-        
-        agents = cursor.fetchall()
-        
-        if not agents:
-            print("\n❌ NO BUILTIN AGENTS FOUND - Database needs seeding!")
-            return False
-        
-        print(f"\n✓ Found {len(agents)} builtin agents:\n")
-        
-        ingestion_count = 0
-        query_count = 0
-        management_count = 0
-        
-        for agent_id, agent_name, agent_class, is_inbuilt, enabled in agents:
-            status = "✓" if enabled else "✗"
-            print(f"  {status} [{agent_class:12}] {agent_id:40} - {agent_name}")
-            
-            if agent_class == 'ingestion':
-                ingestion_count += 1
-            elif agent_class == 'query':
-                query_count += 1
-            elif agent_class == 'management':
-                management_count += 1
-        
-        print(f"\nSummary:")
-        print(f"  - Ingestion agents: {ingestion_count}")
-        print(f"  - Query agents: {query_count}")
-        print(f"  - Management agents: {management_count}")
-        
-        # Check domains
-        print("\n" + "="*80)
-        print("DOMAINS CHECK")
-        print("="*80)
-        
-        cursor.execute("""
-            SELECT domain_id, domain_name, description
-            FROM domain_configurations
-        """)
-        
-        domains = cursor.fetchall()
+        _pools[key] = pool
+    return pool
+
+
+# Published by the data stack alongside its CloudFormation outputs
+DB_SECRET_ARN_PARAMETER = '/app/database/secret-arn'
+DB_ENDPOINT_PARAMETER = '/app/database/endpoint'
+
+
+def get_db_location(session):
+    """Return (secret_arn, db_host), falling back to stack outputs if SSM lacks them"""
+    ssm = session.client('ssm')
+    response = ssm.get_parameters(Names=[DB_SECRET_ARN_PARAMETER, DB_ENDPOINT_PARAMETER])
+    params = {p['Name']: p['Value'] for p in response['Parameters']}
+    if not response['InvalidParameters']:
+        return params[DB_SECRET_ARN_PARAMETER], params[DB_ENDPOINT_PARAMETER]
+    
+    cfn = session.client('cloudformation')
+    response = cfn.describe_stacks(StackName='MultiAgentOrchestration-dev-Data')
+    outputs = {o['OutputKey']: o['OutputValue'] for o in response['Stacks'][0]['Outputs']}
+    return outputs['DatabaseSecretArn'], outputs['DatabaseEndpoint']
+
+
+def main():
+    try:
+        import boto3
         
-        if not domains:
-            print("\n❌ NO DOMAINS FOUND")
-        else:
-            print(f"\n✓ Found {len(domains)} domain(s):\n")
-            for domain_id, domain_name, description in domains:
-                print(f"  - {domain_id}: {domain_name}")
-                print(f"    {description}")
+        # One session for both clients so credentials and config resolve once
+        session = boto3.session.Session(region_name='us-east-1')
         
-        cursor.close()
-        conn.close()
+        # Get database location from the SSM parameters the data stack publishes
+        secret_arn, db_host = get_db_location(session)
         
-        print("\n" + "="*80)
-        print("✓ Database is seeded and ready for E2E testing!")
-        print("="*80 + "\n")
+        # Get database password
+        secrets = session.client('secretsmanager')
+        creds = get_db_credentials(secrets, secret_arn)
         
-        return True
+        # Borrow a connection from the pool
+        pool = get_pool(db_host, creds)
+        conn = pool.getconn()
+        try:
+            return check_seed_data(conn)
+        finally:
+            pool.putconn(conn)
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -114,6 +93,87 @@ def main():
         traceback.print_exc()
         return False
 
+
+# Builtin agents and domains in one round trip, tagged by kind so the rows can
+# be split client-side. For domain rows, detail holds the description.
+SEED_CHECK_QUERY = """
+    SELECT 'agent' AS kind, agent_id AS id, agent_name AS name,
+           agent_class AS detail, enabled
+    FROM agent_definitions
+    WHERE is_inbuilt = true
+    UNION ALL
+    SELECT 'domain', domain_id, domain_name, description, NULL
+    FROM domain_configurations
+    ORDER BY kind, detail, id
+"""
+
+
+def check_seed_data(conn):
+    """Print builtin agents and domains; return True if agents are seeded"""
+    agents = []
+    domains = []
+    
+    # Named (server-side) cursor so rows arrive in batches of itersize rather
+    # than through one fetchall(); agent rows sort before domain rows
+    with conn.cursor(name='seed_check') as cursor:
+        cursor.itersize = 1000
+        cursor.execute(SEED_CHECK_QUERY)
+        for kind, item_id, name, detail, enabled in cursor:
+            if kind == 'agent':
+                agents.append((item_id, name, detail, enabled))
+            else:
+                domains.append((item_id, name, detail))
+    
+    # Check agents
+    print("\n" + "="*80)
+    print("BUILTIN AGENTS CHECK")
+    print("="*80)
+    
+    if not agents:
+        print("\n❌ NO BUILTIN AGENTS FOUND - Database needs seeding!")
+        return False
+    
+    print(f"\n✓ Found {len(agents)} builtin agents:\n")
+    
+    ingestion_count = 0
+    query_count = 0
+    management_count = 0
+    
+    for agent_id, agent_name, agent_class, enabled in agents:
+        status = "✓" if enabled else "✗"
+        print(f"  {status} [{agent_class:12}] {agent_id:40} - {agent_name}")
+        
+        if agent_class == 'ingestion':
+            ingestion_count += 1
+        elif agent_class == 'query':
+            query_count += 1
+        elif agent_class == 'management':
+            management_count += 1
+    
+    print(f"\nSummary:")
+    print(f"  - Ingestion agents: {ingestion_count}")
+    print(f"  - Query agents: {query_count}")
+    print(f"  - Management agents: {management_count}")
+    
+    # Check domains
+    print("\n" + "="*80)
+    print("DOMAINS CHECK")
+    print("="*80)
+    
+    if not domains:
+        print("\n❌ NO DOMAINS FOUND")
+    else:
+        print(f"\n✓ Found {len(domains)} domain(s):\n")
+        for domain_id, domain_name, description in domains:
+            print(f"  - {domain_id}: {domain_name}")
+            print(f"    {description}")
+    
+    print("\n" + "="*80)
+    print("✓ Database is seeded and ready for E2E testing!")
+    print("="*80 + "\n")
+    
+    return True
+
 if __name__ == "__main__":
     success = main()
     sys.exit(0 if success else 1)
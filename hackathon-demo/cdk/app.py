@@ -4,12 +4,13 @@ Minimal CDK stack for hackathon demo
 DynamoDB + Lambda + API Gateway (no auth)
 """
 from aws_cdk import (
-    App, Stack, Duration,
+    App, Stack, Duration, BundlingOptions,
     aws_dynamodb as dynamodb,
     aws_lambda as lambda_,
     aws_apigateway as apigw,
     aws_events as events,
     aws_iam as iam,
+    aws_location as location,
     RemovalPolicy
 )
 from constructs import Construct
@@ -31,26 +32,75 @@ class HackathonDemoStack(Stack):
             removal_policy=RemovalPolicy.DESTROY  # For demo only
         )
         
+        # Lets the query agent's severity filter read only matching reports
+        table.add_global_secondary_index(
+            index_name='severity-index',
+            partition_key=dynamodb.Attribute(
+                name='severity',
+                type=dynamodb.AttributeType.STRING
+            ),
+            sort_key=dynamodb.Attribute(
+                name='created_at',
+                type=dynamodb.AttributeType.STRING
+            )
+        )
+        
         # Event bus for real-time status
         event_bus = events.EventBus(
             self, 'StatusEventBus',
             event_bus_name='domainflow-status'
         )
         
+        # Geocoder for report addresses. Coordinates are saved with each
+        # report, which the data provider only permits with Storage use.
+        place_index = location.CfnPlaceIndex(
+            self, 'PlaceIndex',
+            index_name='civic-places',
+            data_source='Esri',
+            data_source_configuration=location.CfnPlaceIndex.DataSourceConfigurationProperty(
+                intended_use='Storage'
+            )
+        )
+        
+        # Bedrock cross-region inference profiles used by the orchestrator. The
+        # orchestrator calls Bedrock in this region whatever the stack region is.
+        bedrock_region = 'us-east-1'
+        orchestrator_model = 'us.amazon.nova-pro-v1:0'
+        agent_model = 'us.amazon.nova-lite-v1:0'
+        
+        # Shared code asset for both functions. Dependencies are installed inside
+        # the Lambda build image for arm64 so native wheels match the runtime.
+        lambda_code = lambda_.Code.from_asset(
+            '../lambda',
+            bundling=BundlingOptions(
+                image=lambda_.Runtime.PYTHON_3_11.bundling_image,
+                platform='linux/arm64',
+                command=[
+                    'bash', '-c',
+                    'pip install -r requirements.txt -t /asset-output && cp -au . /asset-output'
+                ]
+            )
+        )
+        
         # Lambda orchestrator
         orchestrator = lambda_.Function(
             self, 'Orchestrator',
             function_name='domainflow-orchestrator',
             runtime=lambda_.Runtime.PYTHON_3_11,
+            architecture=lambda_.Architecture.ARM_64,
             handler='orchestrator.lambda_handler',
-            code=lambda_.Code.from_asset('../lambda'),
+            code=lambda_code,
             timeout=Duration.seconds(60),
-            memory_size=512,
+            # 1769 MB is one full vCPU: faster cold-start imports and JSON work
+            # between Bedrock calls, for about the same cost per invocation
+            memory_size=1769,
             environment={
                 'TABLE_NAME': table.table_name,
                 'EVENT_BUS': event_bus.event_bus_name,
-                'ORCHESTRATOR_MODEL': 'us.amazon.nova-pro-v1:0',
-                'AGENT_MODEL': 'us.amazon.nova-lite-v1:0'
+                'ORCHESTRATOR_MODEL': orchestrator_model,
+                'AGENT_MODEL': agent_model,
+                'BEDROCK_REGION': bedrock_region,
+                'PLACE_INDEX': place_index.index_name
             }
         )
         
@@ -58,11 +108,28 @@ class HackathonDemoStack(Stack):
         table.grant_read_write_data(orchestrator)
         event_bus.grant_put_events_to(orchestrator)
         
-        # Grant Bedrock access
+        # Grant Bedrock access to the two models only. A "us." inference profile
+        # routes to the underlying foundation model in any US region, so both
+        # the profile and the model ARNs (all regions) are needed.
+        bedrock_resources = []
+        for profile_id in (orchestrator_model, agent_model):
+            model_id = profile_id.split('.', 1)[1]
+            bedrock_resources += [
+                f'arn:aws:bedrock:{bedrock_region}:{self.account}:inference-profile/{profile_id}',
+                f'arn:aws:bedrock:*::foundation-model/{model_id}'
+            ]
+        
+        orchestrator.add_to_role_policy(
+            iam.PolicyStatement(
+                actions=['bedrock:InvokeModel', 'bedrock:InvokeModelWithResponseStream'],
+                resources=bedrock_resources
+            )
+        )
+        
         orchestrator.add_to_role_policy(
             iam.PolicyStatement(
-                actions=['bedrock:InvokeModel', 'bedrock:Converse'],
-                resources=['*']
+                actions=['geo:SearchPlaceIndexForText'],
+                resources=[place_index.attr_index_arn]
             )
         )
         
@@ -90,39 +157,12 @@ class HackathonDemoStack(Stack):
             self, 'ListReports',
             function_name='domainflow-list-reports',
             runtime=lambda_.Runtime.PYTHON_3_11,
-            handler='index.lambda_handler',
-            code=lambda_.Code.from_inline(f"""
-import json
-import boto3
-from decimal import Decimal
-
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('{table.table_name}')
-
-def decimal_default(obj):
-    if isinstance(obj, Decimal):
-        return float(obj)
-    raise TypeError
-
-def lambda_handler(event, context):
-    try:
-        response = table.scan()
-        items = response.get('Items', [])
-        
-        return {{
-            'statusCode': 200,
-            'headers': {{
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            }},
-            'body': json.dumps({{'reports': items}}, default=decimal_default)
-        }}
-    except Exception as e:
-        return {{
-            'statusCode': 500,
-            'body': json.dumps({{'error': str(e)}})
-        }}
-"""),
+            architecture=lambda_.Architecture.ARM_64,
+            handler='list_reports.lambda_handler',
+            code=lambda_code,
+            environment={
+                'TABLE_NAME': table.table_name
+            },
             timeout=Duration.seconds(10)
         )
         
@@ -0,0 +1,45 @@
+"""
+List reports for hackathon demo
+Backs GET /reports with a paginated scan of the reports table
+"""
+import json
+import os
+import boto3
+from decimal import Decimal
+
+# AWS clients (created once per container, reused across invocations)
+dynamodb = boto3.resource('dynamodb')
+
+# Environment
+TABLE_NAME = os.environ.get('TABLE_NAME', 'civic-reports')
+table = dynamodb.Table(TABLE_NAME)
+
+
+def decimal_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def lambda_handler(event, context):
+    try:
+        # Follow LastEvaluatedKey so reports past the first 1 MB page are returned
+        response = table.scan()
+        items = response.get('Items', [])
+        while 'LastEvaluatedKey' in response:
+            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
+            items.extend(response.get('Items', []))
+
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'reports': items}, default=decimal_default)
+        }
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
@@ -4,23 +4,74 @@ Single Lambda handling all agent operations with real-time status
 Follows structured response schemas (meta-level + micro-level)
 """
 import json
+import logging
 import os
 import boto3
+import orjson
+from botocore.exceptions import ClientError
 from datetime import datetime
 from decimal import Decimal
+import queue
+import threading
 import uuid
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
 
 # AWS clients
 dynamodb = boto3.resource('dynamodb')
-bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
+# Query reads use the low-level client so items skip the resource layer's
+# Decimal deserialization (see from_attribute_value)
+dynamodb_client = boto3.client('dynamodb')
+bedrock = boto3.client('bedrock-runtime', region_name=os.environ.get('BEDROCK_REGION', 'us-east-1'))
 events = boto3.client('events')
+location_client = boto3.client('location')
+
+# Bedrock calls are network-bound, so independent agents run concurrently on a
+# pool that lives for the whole container (three query agents, or the scan
+# segments)
+agent_executor = ThreadPoolExecutor(max_workers=4)
 
 # Environment
 TABLE_NAME = os.environ.get('TABLE_NAME', 'civic-reports')
 EVENT_BUS = os.environ.get('EVENT_BUS', 'default')
 ORCHESTRATOR_MODEL = os.environ.get('ORCHESTRATOR_MODEL', 'us.amazon.nova-pro-v1:0')
 AGENT_MODEL = os.environ.get('AGENT_MODEL', 'us.amazon.nova-lite-v1:0')
+PLACE_INDEX = os.environ.get('PLACE_INDEX')
+# Geocoder matches below this relevance (0-1) are ignored, and locations the
+# model itself rates as vague are not geocoded at all
+GEOCODE_MIN_RELEVANCE = 0.8
+GEOCODE_MIN_CONFIDENCE = 0.7
+SEVERITY_INDEX = 'severity-index'
+SEVERITY_LEVELS = ('low', 'medium', 'high', 'critical')
+SCAN_SEGMENTS = 4
+
+JSON_DECODER = json.JSONDecoder()
+
+# Reports table shared by every request. Loading its metadata during init
+# opens the DynamoDB connection before the first invocation is timed.
+table = dynamodb.Table(TABLE_NAME)
+try:
+    table.load()
+except Exception as e:
+    logger.warning("Could not prime reports table: %s", e)
+
+# EventBridge accepts at most 10 entries per PutEvents call
+STATUS_BATCH_SIZE = 10
+STATUS_BATCH_WINDOW_SECONDS = 0.05
+
+# Recent query results and map data, keyed by filters. An entry is reused
+# only if this container has written no report since it was built, and for
+# at most QUERY_CACHE_TTL_SECONDS, which bounds staleness from writes made
+# by other containers.
+QUERY_CACHE_SIZE = 64
+QUERY_CACHE_TTL_SECONDS = 10
+query_cache = OrderedDict()
+data_version = 0
 
 # Agent definitions
 AGENTS = {
@@ -108,93 +159,578 @@ Output JSON:
 }
 
 
+# Ingestion extracts location, entity and severity in one forced tool call
+EXTRACT_REPORT_PROMPT = """You are a civic report extraction agent. Call extract_report with the fields below for the user's report.
+
+LOCATION: the most specific street address, intersection, or landmark in the report, including city and region when known. It is sent to a geocoder, so write it as a searchable address.
+- geo_coordinates: your best [longitude, latitude] estimate for that location, as numbers. Used only if geocoding fails.
+
+LOCATION CONFIDENCE:
+- 0.95-1.0: Exact address with known coordinates
+- 0.85-0.94: Specific street address, estimated coordinates
+- 0.70-0.84: Intersection or landmark, good estimate
+- 0.50-0.69: General area/neighborhood, approximate
+- 0.00-0.49: Very vague, default coordinates
+
+ENTITY: what is broken or needs attention, e.g. "Dangerous pothole". Be specific.
+Set entity_confidence to 0.95 if the issue is clearly stated, 0.8 if somewhat vague.
+
+SEVERITY: low, medium, high, or critical.
+- critical: immediate danger (e.g., "dangerous", "urgent", "immediate")
+- high: significant issue (e.g., "needs repair", "broken")
+- medium: moderate issue
+- low: minor issue (e.g., "graffiti", "cosmetic")
+Set severity_confidence to 0.9 if urgency keywords are present."""
+
+EXTRACT_REPORT_TOOL = {
+    "tools": [{
+        "toolSpec": {
+            "name": "extract_report",
+            "description": "Record the location, entity and severity of a civic report",
+            "inputSchema": {
+                "json": {
+                    "type": "object",
+                    "properties": {
+                        "location": {"type": "string", "description": "Full address or best description"},
+                        "geo_coordinates": {
+                            "type": "array",
+                            "items": {"type": "number"},
+                            "description": "[longitude, latitude]"
+                        },
+                        "location_confidence": {"type": "number"},
+                        "location_reasoning": {"type": "string", "description": "Brief explanation of coordinate estimation"},
+                        "entity": {"type": "string"},
+                        "entity_confidence": {"type": "number"},
+                        "severity": {"type": "string", "enum": ["low", "medium", "high", "critical"]},
+                        "severity_confidence": {"type": "number"}
+                    },
+                    "required": [
+                        "location", "geo_coordinates", "location_confidence",
+                        "entity", "entity_confidence", "severity", "severity_confidence"
+                    ]
+                }
+            }
+        }
+    }],
+    "toolChoice": {"tool": {"name": "extract_report"}}
+}
+
+
+# Static agent prompts. The request text is sent only as the user turn, so
+# each system prompt is identical across requests and memoized calls key on
+# the message alone.
+WHAT_AGENT_PROMPT = """Analyze the user's query and extract filters. Return ONLY valid JSON, no other text.
+
+Extract:
+- severity: if mentioned (low, medium, high, critical)
+- entity: if specific type mentioned (pothole, streetlight, graffiti, etc)
+
+Format: {"filters": {"severity": "high", "entity": "pothole"}, "analysis": "User wants high severity potholes"}
+
+If no filters mentioned, return empty filters object.
+"""
+
+WHERE_AGENT_PROMPT = """Analyze the user's query for location filters. Return ONLY valid JSON, no other text.
+
+Extract:
+- location: if specific street/area mentioned
+
+Format: {"filters": {"location": "Main Street"}, "analysis": "User wants reports on Main Street"}
+
+If no location mentioned, return empty filters object.
+"""
+
+WHEN_AGENT_PROMPT = "Analyze time/trend aspects. Output JSON: {\"filters\": {...}, \"analysis\": \"...\"}"
+
+MANAGEMENT_PROMPT = """You are a task management specialist. Parse the user's command and extract:
+1. The report ID (UUID format) - REQUIRED, must be present in command
+2. The action (assign, update_status, set_priority, add_note)
+3. The parameters (team name, status value, priority, note)
+
+CRITICAL RULES:
+- You MUST extract a report ID from the command
+- You CANNOT create new reports - only update existing ones
+- If no report ID is found, return an error
+
+Return ONLY valid JSON in this exact format:
+{
+  "report_id": "extracted-uuid-here",
+  "action": "assign",
+  "updates": {
+    "assignee": "Team Name",
+    "status": "in_progress",
+    "assigned_at": "2025-10-23T00:00:00Z"
+  },
+  "confirmation": "Brief confirmation message"
+}
+
+Valid actions: assign, update_status, set_priority, add_note
+Valid statuses: pending, in_progress, resolved, closed
+Valid priorities: low, medium, high, critical
+"""
+
+# Converse system blocks for the static prompts, built once per container.
+# Dynamic prompts such as the verifier's are wrapped per call instead. No
+# cachePoint: every prompt here is below the 1K-token minimum Nova needs
+# before it will cache a prefix.
+SYSTEM_BLOCKS = {
+    prompt: [{"text": prompt}]
+    for prompt in (
+        EXTRACT_REPORT_PROMPT,
+        WHAT_AGENT_PROMPT,
+        WHERE_AGENT_PROMPT,
+        WHEN_AGENT_PROMPT,
+        MANAGEMENT_PROMPT
+    )
+}
+
+# Inference settings shared by every free-text Converse call
+INFERENCE_CONFIG = {
+    "maxTokens": 2000,
+    "temperature": 0.7
+}
+
+# Latency-optimized inference is requested on every call. Models that reject
+# it are remembered here and called on the standard path from then on; Nova
+# Lite is known not to offer it, so it starts out on the standard path.
+LATENCY_OPTIMIZED = {"latency": "optimized"}
+standard_latency_models = {'us.amazon.nova-lite-v1:0', 'amazon.nova-lite-v1:0'}
+
+
+def log_json(level, message, **fields):
+    """Log a single-line JSON record so each entry is one queryable CloudWatch event"""
+    record = {'level': logging.getLevelName(level), 'message': message, **fields}
+    logger.log(level, json.dumps(record, default=str))
+
+
+def extract_json(text):
+    """Parse the first JSON object in a model response, ignoring surrounding prose"""
+    start = text.find('{')
+    if start < 0:
+        raise ValueError("No JSON object in response")
+    # raw_decode stops at the end of the object, so trailing text (even text
+    # containing braces) needs no second scan with rfind
+    return JSON_DECODER.raw_decode(text, start)[0]
+
+
 def emit_status(session_id, agent_id, status, message, data=None):
-    """Emit real-time status event"""
-    try:
-        events.put_events(
-            Entries=[{
-                'Source': 'domainflow.orchestrator',
-                'DetailType': 'AgentStatus',
-                'Detail': json.dumps({
-                    'session_id': session_id,
-                    'agent_id': agent_id,
-                    'status': status,
-                    'message': message,
-                    'data': data,
-                    'timestamp': datetime.utcnow().isoformat()
-                }),
-                'EventBusName': EVENT_BUS
-            }]
-        )
-    except Exception as e:
-        print(f"Failed to emit status: {e}")
+    """Queue a real-time status event; the publisher thread sends it"""
+    status_queue.put_nowait({
+        'Source': 'domainflow.orchestrator',
+        'DetailType': 'AgentStatus',
+        'Detail': orjson.dumps({
+            'session_id': session_id,
+            'agent_id': agent_id,
+            'status': status,
+            'message': message,
+            'data': data,
+            # orjson writes naive datetimes natively, in isoformat() form
+            'timestamp': datetime.utcnow()
+        }, default=decimal_default).decode(),
+        'EventBusName': EVENT_BUS
+    })
+
+
+def publish_status_events():
+    """Drain status_queue in PutEvents batches of up to 10 entries"""
+    while True:
+        entries = [status_queue.get()]
+        deadline = time.monotonic() + STATUS_BATCH_WINDOW_SECONDS
+        while len(entries) < STATUS_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entries.append(status_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        try:
+            events.put_events(Entries=entries)
+        except Exception as e:
+            log_json(logging.WARNING, "Failed to emit status", error=str(e), count=len(entries))
+        finally:
+            for _ in entries:
+                status_queue.task_done()
+
+
+def flush_status():
+    """Block until every queued status event has been sent"""
+    status_queue.join()
+
+
+# Status events are published off the request path by one daemon thread that
+# lives for the container; the handler flushes before returning so nothing is
+# left queued when Lambda freezes the environment
+status_queue = queue.Queue()
+threading.Thread(target=publish_status_events, daemon=True).start()
 
 
-def invoke_bedrock(system_prompt, user_message, conversation_history=None, use_large_model=False):
-    """Invoke Bedrock model (Nova Lite for agents, Nova Pro for orchestrator)"""
-    messages = []
+def invoke_bedrock(system_prompt, user_message, conversation_history=None, use_large_model=False, json_only=False):
+    """Invoke Bedrock model (Nova Lite for agents, Nova Pro for orchestrator)
+
+    With json_only the reply is streamed and generation is cut off once the
+    first JSON object closes, so trailing prose is never waited for.
+    """
+    # Use Nova Pro for orchestrator/verifier, Nova Lite for agents
+    model_id = ORCHESTRATOR_MODEL if use_large_model else AGENT_MODEL
     
-    # Add conversation history
-    if conversation_history:
-        messages.extend(conversation_history)
+    # Single-turn calls are memoized in-process: an identical prompt and
+    # message (e.g. a resubmitted report) skips the Bedrock round trip. A JSON
+    # reply that does not parse is returned but not cached, so an identical
+    # retry asks the model again instead of replaying the bad reply.
+    if not conversation_history:
+        try:
+            return converse_cached(model_id, system_prompt, user_message, json_only)
+        except UnparsedReply as e:
+            return e.text
     
-    # Add current message - content must be a list
-    messages.append({
-        "role": "user",
-        "content": [{"text": user_message}]
-    })
+    return converse(model_id, system_prompt, user_message, conversation_history, json_only)
+
+
+class UnparsedReply(ValueError):
+    """A JSON-only reply with no parseable object; carries the raw text"""
     
-    # Use Nova Pro for orchestrator/verifier, Nova Lite for agents
-    model_id = ORCHESTRATOR_MODEL if use_large_model else AGENT_MODEL
+    def __init__(self, text):
+        super().__init__("Reply has no parseable JSON object")
+        self.text = text
+
+
+@lru_cache(maxsize=256)
+def converse_cached(model_id, system_prompt, user_message, json_only=False):
+    text = converse(model_id, system_prompt, user_message, json_only=json_only)
+    if json_only:
+        # lru_cache does not store exceptions, so raising keeps this reply out
+        try:
+            extract_json(text)
+        except ValueError:
+            raise UnparsedReply(text)
+    return text
+
+
+def converse(model_id, system_prompt, user_message, conversation_history=None, json_only=False):
+    # Only management passes history; the extraction and query agents are
+    # stateless. Build the message list in one pass - content must be a list
+    messages = [
+        *(conversation_history or ()),
+        {"role": "user", "content": [{"text": user_message}]}
+    ]
+    
+    request = {
+        'modelId': model_id,
+        'messages': messages,
+        'system': SYSTEM_BLOCKS.get(system_prompt) or [{"text": system_prompt}],
+        'inferenceConfig': INFERENCE_CONFIG
+    }
     
-    response = bedrock.converse(
+    if json_only:
+        return read_json_stream(call_bedrock(bedrock.converse_stream, **request)['stream'])
+    
+    response = call_bedrock(bedrock.converse, **request)
+    return response['output']['message']['content'][0]['text']
+
+
+def call_bedrock(operation, **request):
+    """Call a Converse operation, latency-optimized where the model supports it"""
+    model_id = request['modelId']
+    if model_id in standard_latency_models:
+        return operation(**request)
+    
+    try:
+        return operation(performanceConfig=LATENCY_OPTIMIZED, **request)
+    except ClientError as e:
+        if not latency_unsupported(e):
+            raise
+        log_json(logging.WARNING, "Latency-optimized inference unavailable, using standard", model_id=model_id, error=str(e))
+        standard_latency_models.add(model_id)
+        return operation(**request)
+
+
+def latency_unsupported(error):
+    """True when Bedrock rejected the request because of its latency setting"""
+    if error.response['Error']['Code'] != 'ValidationException':
+        return False
+    message = error.response['Error'].get('Message', '').lower()
+    return 'performanceconfig' in message or 'latency' in message
+
+
+def read_json_stream(stream):
+    """Collect streamed text until the first top-level JSON object closes"""
+    chunks = []
+    depth = 0
+    in_string = escaped = closed = False
+    try:
+        for event in stream:
+            text = event.get('contentBlockDelta', {}).get('delta', {}).get('text')
+            if not text:
+                continue
+            # Anything after the object is prose the caller discards. Stop at
+            # the first such token; a reply that ends cleanly is read to the
+            # end so the connection goes back to the pool.
+            if closed:
+                break
+            chunks.append(text)
+            for ch in text:
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == '\\':
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"':
+                    in_string = depth > 0
+                elif ch == '{':
+                    depth += 1
+                elif ch == '}' and depth:
+                    depth -= 1
+                    closed = depth == 0
+                    if closed:
+                        break
+    finally:
+        stream.close()
+    return ''.join(chunks)
+
+
+def extract_report(user_message):
+    """Return the extract_report tool input for a report message"""
+    # The cache holds serialized JSON so each caller gets a fresh dict to edit
+    return orjson.loads(extract_report_cached(AGENT_MODEL, user_message))
+
+
+@lru_cache(maxsize=256)
+def extract_report_cached(model_id, user_message):
+    response = call_bedrock(
+        bedrock.converse,
         modelId=model_id,
-        messages=messages,
-        system=[{"text": system_prompt}],
+        messages=[{"role": "user", "content": [{"text": user_message}]}],
+        system=SYSTEM_BLOCKS[EXTRACT_REPORT_PROMPT],
+        toolConfig=EXTRACT_REPORT_TOOL,
+        # Greedy decoding keeps the tool arguments well-formed
         inferenceConfig={
             "maxTokens": 2000,
-            "temperature": 0.7
+            "temperature": 0
         }
     )
     
-    return response['output']['message']['content'][0]['text']
+    for block in response['output']['message']['content']:
+        if 'toolUse' in block:
+            return orjson.dumps(block['toolUse']['input'])
+    raise ValueError("Model did not call extract_report")
 
 
-def query_reports(filters):
-    """Query DynamoDB for reports"""
-    table = dynamodb.Table(TABLE_NAME)
+def normalize_report_fields(fields):
+    """Return extract_report fields with their types checked
+
+    The tool schema is only a hint, so the model can still send string
+    coordinates or confidences. A malformed group is dropped and takes the
+    same fallback as a missing one.
+    """
+    fields = dict(fields)
+    try:
+        lng, lat = fields['geo_coordinates']
+        fields['geo_coordinates'] = [float(lng), float(lat)]
+        fields['location_confidence'] = float(fields.get('location_confidence', 0.9))
+        if not isinstance(fields.get('location', ''), str):
+            raise TypeError("location is not a string")
+    except (KeyError, TypeError, ValueError):
+        fields.pop('geo_coordinates', None)
+    
+    try:
+        if not isinstance(fields['entity'], str):
+            raise TypeError("entity is not a string")
+        fields['entity_confidence'] = float(fields.get('entity_confidence', 0.9))
+    except (KeyError, TypeError, ValueError):
+        fields.pop('entity', None)
+    
+    # severity is the severity-index partition key, so only a known level may
+    # reach save_report
+    try:
+        fields['severity'] = fields['severity'].strip().lower()
+        if fields['severity'] not in SEVERITY_LEVELS:
+            raise ValueError("unknown severity")
+        fields['severity_confidence'] = float(fields.get('severity_confidence', 0.9))
+    except (KeyError, AttributeError, TypeError, ValueError):
+        fields.pop('severity', None)
     
-    # Simple scan with filters (for demo - use GSI in production)
-    response = table.scan()
+    return fields
+
+
+def geocode(address):
+    """Return [longitude, latitude] for an address from the place index, or None"""
+    if not PLACE_INDEX or not address:
+        return None
+    point = geocode_cached(' '.join(address.lower().split()))
+    return list(point) if point else None
+
+
+@lru_cache(maxsize=1024)
+def geocode_cached(address):
+    response = location_client.search_place_index_for_text(
+        IndexName=PLACE_INDEX,
+        Text=address,
+        MaxResults=1
+    )
+    results = response.get('Results')
+    # Vague text ("near the post office") can still match somewhere arbitrary;
+    # a weak match is dropped so the model's estimate is kept instead
+    if not results or results[0].get('Relevance', 0) < GEOCODE_MIN_RELEVANCE:
+        return None
+    return tuple(results[0]['Place']['Geometry']['Point'])
+
+
+def read_all_pages(operation, **kwargs):
+    """Call a DynamoDB query/scan until LastEvaluatedKey runs out and return all items"""
+    response = operation(**kwargs)
     items = response.get('Items', [])
+    while 'LastEvaluatedKey' in response:
+        response = operation(ExclusiveStartKey=response['LastEvaluatedKey'], **kwargs)
+        items.extend(response.get('Items', []))
+    return items
+
+
+def query_reports(filters):
+    """Query DynamoDB for reports"""
+    # Severity is an exact match, so it is served by severity-index and
+    # DynamoDB returns only matching reports. Without it, fall back to a
+    # parallel scan. Both paths follow LastEvaluatedKey past the 1 MB page.
+    # The filter comes from the model, so anything but a single severity
+    # string (e.g. ["high", "critical"]) also falls back to the scan.
+    severity = filters.get('severity')
+    if severity and isinstance(severity, str):
+        items = read_all_pages(
+            dynamodb_client.query,
+            TableName=TABLE_NAME,
+            IndexName=SEVERITY_INDEX,
+            KeyConditionExpression='severity = :severity',
+            ExpressionAttributeValues={':severity': {'S': severity}}
+        )
+    else:
+        # The agent pool is idle by the time the database is queried
+        segments = agent_executor.map(
+            lambda segment: read_all_pages(
+                dynamodb_client.scan,
+                TableName=TABLE_NAME,
+                Segment=segment,
+                TotalSegments=SCAN_SEGMENTS
+            ),
+            range(SCAN_SEGMENTS)
+        )
+        items = [item for segment_items in segments for item in segment_items]
     
-    # Apply filters
+    # Entity and location are case-insensitive substring matches, which
+    # DynamoDB filter expressions cannot express, so apply them here on the
+    # raw items and only deserialize the reports that survive
     filtered = items
-    if 'severity' in filters:
-        filtered = [i for i in filtered if i.get('severity') == filters['severity']]
+    if severity and not isinstance(severity, str):
+        # Only a list of severity strings can match; anything else matches nothing
+        wanted = [v for v in severity if isinstance(v, str)] if isinstance(severity, list) else []
+        filtered = [i for i in filtered if i.get('severity', {}).get('S') in wanted]
     if 'entity' in filters:
-        filtered = [i for i in filtered if filters['entity'].lower() in i.get('entity', '').lower()]
+        entity = filters['entity'].lower()
+        filtered = [i for i in filtered if entity in i.get('entity', {}).get('S', '').lower()]
     if 'location' in filters:
-        filtered = [i for i in filtered if filters['location'].lower() in i.get('location', '').lower()]
+        location = filters['location'].lower()
+        filtered = [i for i in filtered if location in i.get('location', {}).get('S', '').lower()]
+    
+    return [{k: from_attribute_value(v) for k, v in item.items()} for item in filtered]
+
+
+def from_attribute_value(value):
+    """Convert a DynamoDB AttributeValue to plain Python, numbers as floats
+
+    Numbers become floats directly rather than Decimals, so query responses
+    encode without the decimal_default callback.
+    """
+    (kind, data), = value.items()
+    if kind == 'S' or kind == 'BOOL':
+        return data
+    if kind == 'N':
+        return float(data)
+    if kind == 'M':
+        return {k: from_attribute_value(v) for k, v in data.items()}
+    if kind == 'L':
+        return [from_attribute_value(v) for v in data]
+    if kind == 'NULL':
+        return None
+    if kind == 'NS':
+        return [float(n) for n in data]
+    return data
+
+
+def build_map_data(reports):
+    """Build a GeoJSON FeatureCollection of the reports that have coordinates"""
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': report['geo_coordinates']},
+                'properties': {
+                    'report_id': report['report_id'],
+                    'entity': report.get('entity'),
+                    'severity': report.get('severity'),
+                    'location': report.get('location')
+                }
+            }
+            for report in reports
+            if 'geo_coordinates' in report
+        ]
+    }
+
+
+def cached_query(filters):
+    """Return (reports, map_data) for filters, reusing a recent identical query"""
+    key = orjson.dumps(filters, option=orjson.OPT_SORT_KEYS)
+    version = data_version
+    now = time.monotonic()
     
-    return filtered
+    entry = query_cache.get(key)
+    if entry and entry[0] == version and now - entry[1] < QUERY_CACHE_TTL_SECONDS:
+        query_cache.move_to_end(key)
+        return entry[2], entry[3]
+    
+    reports = query_reports(filters)
+    map_data = build_map_data(reports)
+    
+    query_cache[key] = (version, now, reports, map_data)
+    query_cache.move_to_end(key)
+    if len(query_cache) > QUERY_CACHE_SIZE:
+        query_cache.popitem(last=False)
+    return reports, map_data
+
+
+def mark_data_changed():
+    """Invalidate cached queries after this container writes a report"""
+    global data_version
+    data_version += 1
 
 
 def convert_floats_to_decimal(obj):
     """Convert float values to Decimal for DynamoDB"""
-    if isinstance(obj, list):
-        return [convert_floats_to_decimal(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_floats_to_decimal(v) for k, v in obj.items()}
-    elif isinstance(obj, float):
-        return Decimal(str(obj))
-    return obj
+    # Copy containers with an explicit stack instead of recursing, so deeply
+    # nested agent output cannot hit the recursion limit. The input is
+    # wrapped in a one-element list so the root is handled like any child.
+    root = [obj]
+    stack = [(enumerate(root), root)]
+    while stack:
+        pairs, out = stack.pop()
+        for key, value in pairs:
+            if isinstance(value, dict):
+                out[key] = converted = {}
+                stack.append((value.items(), converted))
+            elif isinstance(value, list):
+                out[key] = converted = [None] * len(value)
+                stack.append((enumerate(value), converted))
+            elif isinstance(value, float):
+                out[key] = Decimal(str(value))
+            else:
+                out[key] = value
+    return root[0]
 
 
 def save_report(report_data):
     """Save report to DynamoDB"""
-    table = dynamodb.Table(TABLE_NAME)
-    
     report_id = str(uuid.uuid4())
     item = {
         'report_id': report_id,
@@ -203,42 +739,29 @@ def save_report(report_data):
     }
     
     table.put_item(Item=item)
+    mark_data_changed()
     return report_id
 
 
 def update_report(report_id, updates):
     """Update report in DynamoDB"""
-    table = dynamodb.Table(TABLE_NAME)
-    
-    # Reserved keywords in DynamoDB
-    reserved_keywords = {'status', 'name', 'type', 'data', 'timestamp', 'date', 'time'}
-    
-    update_expr = "SET "
-    expr_values = {}
+    # Alias every attribute name so any DynamoDB reserved word (status, name,
+    # comment, ...) is safe, not just a hand-maintained subset
     expr_names = {}
+    expr_values = {}
+    assignments = []
+    for i, (key, value) in enumerate(updates.items()):
+        expr_names[f"#k{i}"] = key
+        expr_values[f":v{i}"] = value
+        assignments.append(f"#k{i} = :v{i}")
     
-    for key, value in updates.items():
-        # Use expression attribute names for reserved keywords
-        if key.lower() in reserved_keywords:
-            attr_name = f"#{key}"
-            expr_names[attr_name] = key
-            update_expr += f"{attr_name} = :{key}, "
-        else:
-            update_expr += f"{key} = :{key}, "
-        expr_values[f":{key}"] = value
-    
-    update_expr = update_expr.rstrip(", ")
-    
-    update_params = {
-        'Key': {'report_id': report_id},
-        'UpdateExpression': update_expr,
-        'ExpressionAttributeValues': expr_values
-    }
-    
-    if expr_names:
-        update_params['ExpressionAttributeNames'] = expr_names
-    
-    table.update_item(**update_params)
+    table.update_item(
+        Key={'report_id': report_id},
+        UpdateExpression="SET " + ", ".join(assignments),
+        ExpressionAttributeNames=expr_names,
+        ExpressionAttributeValues=expr_values
+    )
+    mark_data_changed()
 
 
 def handle_ingestion(session_id, user_message, conversation_history):
@@ -248,106 +771,60 @@ def handle_ingestion(session_id, user_message, conversation_history):
     """
     start_time = time.time()
     
-    # Orchestrator decides which agents to run
-    emit_status(session_id, 'orchestrator', 'running', 'Planning agent execution...')
-    
-    orchestrator_prompt = """You are an orchestrator. Analyze the input and determine which agents to run:
-- Geo Agent: Extract location information
-- Entity Agent: Extract what's broken/reported
-- Severity Agent: Determine urgency level
-
-Output JSON: {"agents_to_run": ["geo", "entity", "severity"], "reasoning": "..."}"""
+    # Ingestion always runs the same agents, so the plan is fixed rather
+    # than asked of a model
+    emit_status(session_id, 'orchestrator', 'completed', 'Plan: run geo, entity, severity')
     
-    orchestrator_response = invoke_bedrock(orchestrator_prompt, user_message, use_large_model=True)
-    emit_status(session_id, 'orchestrator', 'completed', 'Execution plan ready')
+    # The geo, entity and severity agents share one structured-output call on
+    # Nova Lite; each agent still reports status. Coordinates come from the
+    # place index, with the model's estimate kept only as a fallback.
+    emit_status(session_id, 'geo-agent', 'invoking', 'Extracting and geocoding location...')
+    emit_status(session_id, 'entity-agent', 'invoking', 'Identifying entity...')
+    emit_status(session_id, 'severity-agent', 'invoking', 'Assessing severity...')
     
-    # Run individual agents
-    agent_results = {}
     results = {}
-    
-    # Geo Agent - Use advanced model (Nova Pro) with sophisticated reasoning
-    emit_status(session_id, 'geo-agent', 'invoking', 'Extracting location with advanced reasoning...')
-    
-    geo_prompt = """You are an expert geographic information extraction agent with deep knowledge of global locations, addresses, and coordinate systems.
-
-TASK: Extract precise location information from the user's text.
-
-INPUT TEXT: "{text}"
-
-REASONING PROCESS:
-1. Identify any street addresses, landmarks, intersections, or area names
-2. Determine the most likely geographic region (city, state, country)
-3. Estimate precise coordinates based on:
-   - Known street patterns and numbering systems
-   - Typical city layouts and geography
-   - Landmark proximity if mentioned
-   - Regional coordinate ranges
-
-COORDINATE ESTIMATION GUIDELINES:
-- Use your knowledge of real-world geography
-- Street numbers help estimate position along a street
-- Intersections provide precise locations
-- Landmarks have known coordinates
-- City/neighborhood names give approximate areas
-- Consider typical coordinate ranges for regions:
-  * US East Coast: longitude -80 to -70, latitude 35 to 45
-  * US West Coast: longitude -125 to -115, latitude 30 to 50
-  * US Midwest: longitude -95 to -85, latitude 35 to 45
-  * Europe: longitude -10 to 40, latitude 35 to 70
-  * Asia: longitude 60 to 150, latitude -10 to 60
-
-CONFIDENCE SCORING:
-- 0.95-1.0: Exact address with known coordinates
-- 0.85-0.94: Specific street address, estimated coordinates
-- 0.70-0.84: Intersection or landmark, good estimate
-- 0.50-0.69: General area/neighborhood, approximate
-- 0.00-0.49: Very vague, default coordinates
-
-OUTPUT FORMAT (JSON only, no other text):
-{{
-  "location": "full address or best description",
-  "geo_coordinates": [longitude, latitude],
-  "confidence": 0.0-1.0,
-  "reasoning": "brief explanation of coordinate estimation"
-}}
-
-CRITICAL RULES:
-- ALWAYS provide geo_coordinates as [longitude, latitude] numbers
-- NEVER use null or omit coordinates
-- Use your geographic knowledge to make intelligent estimates
-- Higher confidence for more specific locations
-- Lower confidence for vague descriptions
-
-Now extract location from the input text above.""".format(text=user_message)
-    
-    # Use Nova Pro for better reasoning
-    geo_response = invoke_bedrock(geo_prompt, user_message, use_large_model=True)
-    
     try:
-        # Try to extract JSON from response
-        json_start = geo_response.find('{')
-        json_end = geo_response.rfind('}') + 1
-        if json_start >= 0 and json_end > json_start:
-            geo_response = geo_response[json_start:json_end]
-        results['geo'] = json.loads(geo_response)
+        fields = extract_report(user_message)
+    except Exception as e:
+        log_json(logging.ERROR, "Report extraction failed", error=str(e))
+        fields = {}
+    fields = normalize_report_fields(fields)
+    
+    if 'geo_coordinates' in fields:
+        results['geo'] = {
+            'location': fields.get('location', 'Unknown location'),
+            'geo_coordinates': fields['geo_coordinates'],
+            'confidence': fields.get('location_confidence', 0.9),
+            'reasoning': fields.get('location_reasoning', '')
+        }
+        
+        # Compared as the float normalize_report_fields produced
+        point = None
+        if results['geo']['confidence'] >= GEOCODE_MIN_CONFIDENCE:
+            try:
+                point = geocode(results['geo']['location'])
+            except Exception as e:
+                log_json(logging.WARNING, "Geocoding failed", location=results['geo']['location'], error=str(e))
+        if point:
+            results['geo']['geo_coordinates'] = point
+            results['geo']['reasoning'] = 'Geocoded with Amazon Location Service'
         
         # Validate coordinates
-        coords = results['geo'].get('geo_coordinates')
+        coords = results['geo']['geo_coordinates']
         if not coords or not isinstance(coords, list) or len(coords) != 2:
-            print(f"Invalid coordinates from geo agent: {coords}")
+            log_json(logging.WARNING, "Invalid coordinates from geo agent", coords=coords)
             results['geo']['geo_coordinates'] = [-74.0060, 40.7128]  # Fallback
             results['geo']['confidence'] = 0.3
         else:
             # Validate coordinate ranges
             lng, lat = coords
             if not (-180 <= lng <= 180 and -90 <= lat <= 90):
-                print(f"Coordinates out of range: {coords}")
+                log_json(logging.WARNING, "Coordinates out of range", coords=coords)
                 results['geo']['geo_coordinates'] = [-74.0060, 40.7128]
                 results['geo']['confidence'] = 0.3
         
-        emit_status(session_id, 'geo-agent', 'complete', f'Location extracted', {'confidence': results['geo'].get('confidence', 0.9)})
-    except Exception as e:
-        print(f"Geo agent error: {e}, response: {geo_response}")
+        emit_status(session_id, 'geo-agent', 'complete', f'Location extracted', {'confidence': results['geo']['confidence']})
+    else:
         emit_status(session_id, 'geo-agent', 'error', 'Failed to parse location')
         results['geo'] = {
             'location': 'Unknown location',
@@ -356,58 +833,17 @@ Now extract location from the input text above.""".format(text=user_message)
             'reasoning': 'Failed to extract location information'
         }
     
-    # Entity Agent
-    emit_status(session_id, 'entity-agent', 'invoking', 'Identifying entity...')
-    entity_prompt = """Extract what's broken or being reported. Return ONLY valid JSON, no other text.
-
-Text: "{text}"
-
-Identify what is broken or needs attention. Be specific.
-
-Format: {{"entity": "Dangerous pothole", "confidence": 0.95}}
-
-If the issue is clearly stated, set confidence to 0.95.
-If somewhat vague, set confidence to 0.8.
-""".format(text=user_message)
-    entity_response = invoke_bedrock(entity_prompt, user_message)
-    try:
-        json_start = entity_response.find('{')
-        json_end = entity_response.rfind('}') + 1
-        if json_start >= 0 and json_end > json_start:
-            entity_response = entity_response[json_start:json_end]
-        results['entity'] = json.loads(entity_response)
-        emit_status(session_id, 'entity-agent', 'complete', f'Entity identified', {'confidence': results['entity'].get('confidence', 0.9)})
-    except Exception as e:
-        print(f"Entity agent error: {e}, response: {entity_response}")
+    if 'entity' in fields:
+        results['entity'] = {'entity': fields['entity'], 'confidence': fields.get('entity_confidence', 0.9)}
+        emit_status(session_id, 'entity-agent', 'complete', f'Entity identified', {'confidence': results['entity']['confidence']})
+    else:
         emit_status(session_id, 'entity-agent', 'error', 'Failed to parse entity')
         results['entity'] = {'entity': 'Unknown issue', 'confidence': 0.5}
     
-    # Severity Agent
-    emit_status(session_id, 'severity-agent', 'invoking', 'Assessing severity...')
-    severity_prompt = """Determine severity level: low, medium, high, or critical. Return ONLY valid JSON, no other text.
-
-Text: "{text}"
-
-Assess urgency:
-- critical: immediate danger (e.g., "dangerous", "urgent", "immediate")
-- high: significant issue (e.g., "needs repair", "broken")
-- medium: moderate issue
-- low: minor issue (e.g., "graffiti", "cosmetic")
-
-Format: {{"severity": "high", "confidence": 0.9}}
-
-If urgency keywords present, set confidence to 0.9.
-""".format(text=user_message)
-    severity_response = invoke_bedrock(severity_prompt, user_message)
-    try:
-        json_start = severity_response.find('{')
-        json_end = severity_response.rfind('}') + 1
-        if json_start >= 0 and json_end > json_start:
-            severity_response = severity_response[json_start:json_end]
-        results['severity'] = json.loads(severity_response)
-        emit_status(session_id, 'severity-agent', 'complete', f'Severity assessed', {'confidence': results['severity'].get('confidence', 0.9)})
-    except Exception as e:
-        print(f"Severity agent error: {e}, response: {severity_response}")
+    if 'severity' in fields:
+        results['severity'] = {'severity': fields['severity'], 'confidence': fields.get('severity_confidence', 0.9)}
+        emit_status(session_id, 'severity-agent', 'complete', f'Severity assessed', {'confidence': results['severity']['confidence']})
+    else:
         emit_status(session_id, 'severity-agent', 'error', 'Failed to parse severity')
         results['severity'] = {'severity': 'medium', 'confidence': 0.5}
     
@@ -524,86 +960,45 @@ def handle_query(session_id, user_message, conversation_history):
     """
     start_time = time.time()
     
-    # Orchestrator plans query execution
-    emit_status(session_id, 'orchestrator', 'running', 'Planning query execution...')
-    
-    orchestrator_prompt = """Analyze the query and determine which agents to run:
-- Who Agent: Questions about people/entities
-- What Agent: Questions about incident types
-- Where Agent: Questions about locations
-- When Agent: Questions about time/trends
-
-Output JSON: {"agents_to_run": ["what", "where"], "reasoning": "..."}"""
-    
-    orchestrator_response = invoke_bedrock(orchestrator_prompt, user_message, use_large_model=True)
-    emit_status(session_id, 'orchestrator', 'completed', 'Query plan ready')
+    # Queries always run the same agents, so the plan is fixed rather than
+    # asked of a model
+    emit_status(session_id, 'orchestrator', 'completed', 'Plan: run what, where, when')
     
     # Run query agents
     results = {}
     
-    # What Agent - Extract severity and entity filters
+    # The three query agents are independent, so invoke them all at once
     emit_status(session_id, 'what-agent', 'invoking', 'Analyzing incident types...')
-    what_prompt = """Analyze the query and extract filters. Return ONLY valid JSON, no other text.
-
-Query: "{query}"
-
-Extract:
-- severity: if mentioned (low, medium, high, critical)
-- entity: if specific type mentioned (pothole, streetlight, graffiti, etc)
-
-Format: {{"filters": {{"severity": "high", "entity": "pothole"}}, "analysis": "User wants high severity potholes"}}
-
-If no filters mentioned, return empty filters object.
-""".format(query=user_message)
+    what_future = agent_executor.submit(invoke_bedrock, WHAT_AGENT_PROMPT, user_message, json_only=True)
+    emit_status(session_id, 'where-agent', 'invoking', 'Analyzing locations...')
+    where_future = agent_executor.submit(invoke_bedrock, WHERE_AGENT_PROMPT, user_message, json_only=True)
+    emit_status(session_id, 'when-agent', 'invoking', 'Analyzing temporal patterns...')
+    when_future = agent_executor.submit(invoke_bedrock, WHEN_AGENT_PROMPT, user_message, json_only=True)
     
-    what_response = invoke_bedrock(what_prompt, user_message)
+    what_response = what_future.result()
     try:
-        json_start = what_response.find('{')
-        json_end = what_response.rfind('}') + 1
-        if json_start >= 0 and json_end > json_start:
-            what_response = what_response[json_start:json_end]
-        results['what'] = json.loads(what_response)
+        results['what'] = extract_json(what_response)
         emit_status(session_id, 'what-agent', 'complete', 'Analysis complete', {'confidence': 0.92})
     except Exception as e:
-        print(f"What agent error: {e}, response: {what_response}")
+        log_json(logging.ERROR, "Agent response parse failed", agent="what", error=str(e), response=what_response)
         results['what'] = {'filters': {}, 'analysis': 'Unable to parse'}
         emit_status(session_id, 'what-agent', 'error', 'Failed to parse')
     
-    # Where Agent - Extract location filters
-    emit_status(session_id, 'where-agent', 'invoking', 'Analyzing locations...')
-    where_prompt = """Analyze the query for location filters. Return ONLY valid JSON, no other text.
-
-Query: "{query}"
-
-Extract:
-- location: if specific street/area mentioned
-
-Format: {{"filters": {{"location": "Main Street"}}, "analysis": "User wants reports on Main Street"}}
-
-If no location mentioned, return empty filters object.
-""".format(query=user_message)
-    
-    where_response = invoke_bedrock(where_prompt, user_message)
+    where_response = where_future.result()
     try:
-        json_start = where_response.find('{')
-        json_end = where_response.rfind('}') + 1
-        if json_start >= 0 and json_end > json_start:
-            where_response = where_response[json_start:json_end]
-        results['where'] = json.loads(where_response)
+        results['where'] = extract_json(where_response)
         emit_status(session_id, 'where-agent', 'complete', 'Location analysis complete', {'confidence': 0.88})
     except Exception as e:
-        print(f"Where agent error: {e}, response: {where_response}")
+        log_json(logging.ERROR, "Agent response parse failed", agent="where", error=str(e), response=where_response)
         results['where'] = {'filters': {}, 'analysis': 'Unable to parse'}
         emit_status(session_id, 'where-agent', 'error', 'Failed to parse')
     
-    # When Agent
-    emit_status(session_id, 'when-agent', 'invoking', 'Analyzing temporal patterns...')
-    when_prompt = "Analyze time/trend aspects. Output JSON: {\"filters\": {...}, \"analysis\": \"...\"}"
-    when_response = invoke_bedrock(when_prompt, user_message)
+    when_response = when_future.result()
     try:
-        results['when'] = json.loads(when_response)
+        results['when'] = extract_json(when_response)
         emit_status(session_id, 'when-agent', 'complete', 'Temporal analysis complete', {'confidence': 0.85})
-    except:
+    except Exception as e:
+        log_json(logging.ERROR, "Agent response parse failed", agent="when", error=str(e), response=when_response)
         results['when'] = {'filters': {}, 'analysis': 'Unable to parse'}
         emit_status(session_id, 'when-agent', 'error', 'Failed to parse')
     
@@ -622,32 +1017,9 @@ If no location mentioned, return empty filters object.
     
     # Query database
     emit_status(session_id, 'database', 'running', 'Querying database...')
-    query_results = query_reports(combined_filters)
+    query_results, map_data = cached_query(combined_filters)
     emit_status(session_id, 'database', 'completed', f'Found {len(query_results)} reports')
     
-    # Build map data
-    map_features = []
-    for report in query_results:
-        if 'geo_coordinates' in report:
-            map_features.append({
-                'type': 'Feature',
-                'geometry': {
-                    'type': 'Point',
-                    'coordinates': report['geo_coordinates']
-                },
-                'properties': {
-                    'report_id': report['report_id'],
-                    'entity': report.get('entity'),
-                    'severity': report.get('severity'),
-                    'location': report.get('location')
-                }
-            })
-    
-    map_data = {
-        'type': 'FeatureCollection',
-        'features': map_features
-    }
-    
     # Verifier synthesizes final answer
     emit_status(session_id, 'verifier', 'running', 'Synthesizing answer...')
     
@@ -702,52 +1074,17 @@ def handle_management(session_id, user_message, conversation_history, report_id=
     start_time = time.time()
     emit_status(session_id, 'data-management', 'running', 'Processing command...')
     
-    # Enhanced prompt to get structured JSON
-    enhanced_prompt = f"""You are a task management specialist. Parse this command and extract:
-1. The report ID (UUID format) - REQUIRED, must be present in command
-2. The action (assign, update_status, set_priority, add_note)
-3. The parameters (team name, status value, priority, note)
-
-Command: {user_message}
-
-CRITICAL RULES:
-- You MUST extract a report ID from the command
-- You CANNOT create new reports - only update existing ones
-- If no report ID is found, return an error
-
-Return ONLY valid JSON in this exact format:
-{{
-  "report_id": "extracted-uuid-here",
-  "action": "assign",
-  "updates": {{
-    "assignee": "Team Name",
-    "status": "in_progress",
-    "assigned_at": "2025-10-23T00:00:00Z"
-  }},
-  "confirmation": "Brief confirmation message"
-}}
-
-Valid actions: assign, update_status, set_priority, add_note
-Valid statuses: pending, in_progress, resolved, closed
-Valid priorities: low, medium, high, critical
-"""
-    
     # Invoke agent
     response = invoke_bedrock(
-        enhanced_prompt,
+        MANAGEMENT_PROMPT,
         user_message,
-        conversation_history
+        conversation_history,
+        json_only=True
     )
     
     try:
         # Extract JSON from response
-        json_start = response.find('{')
-        json_end = response.rfind('}') + 1
-        if json_start >= 0 and json_end > json_start:
-            json_str = response[json_start:json_end]
-            data = json.loads(json_str)
-        else:
-            data = json.loads(response)
+        data = extract_json(response)
         
         target_report_id = data.get('report_id') or report_id
         action = data.get('action', 'update')
@@ -775,7 +1112,6 @@ Valid priorities: low, medium, high, critical
             }
         
         # Verify report exists
-        table = dynamodb.Table(TABLE_NAME)
         try:
             existing_report = table.get_item(Key={'report_id': target_report_id})
             if 'Item' not in existing_report:
@@ -800,7 +1136,7 @@ Valid priorities: low, medium, high, critical
             
             previous_values = {k: existing_report['Item'].get(k) for k in updates.keys()}
         except Exception as e:
-            print(f"Error checking report existence: {e}")
+            log_json(logging.WARNING, "Error checking report existence", error=str(e))
             previous_values = {}
         
         if updates:
@@ -848,7 +1184,7 @@ Valid priorities: low, medium, high, critical
                 'error': 'No updates specified. Please specify what to update (e.g., assign to team, change status, set priority)'
             }
     except Exception as e:
-        print(f"Management agent error: {e}, response: {response}")
+        log_json(logging.ERROR, "Agent response parse failed", agent="data-management", error=str(e), response=response)
         emit_status(session_id, 'data-management', 'error', 'Failed to parse command')
         return {
             'error': f'Could not parse command: {str(e)}',
@@ -866,7 +1202,15 @@ def decimal_default(obj):
 def lambda_handler(event, context):
     """Main Lambda handler"""
     try:
-        body = json.loads(event.get('body', '{}'))
+        return handle_request(event)
+    finally:
+        flush_status()
+
+
+def handle_request(event):
+    """Route the API request to the handler for its mode"""
+    try:
+        body = orjson.loads(event.get('body', '{}'))
         
         mode = body.get('mode', 'ingestion')  # ingestion, query, management
         message = body.get('message', '')
@@ -884,7 +1228,7 @@ def lambda_handler(event, context):
         else:
             return {
                 'statusCode': 400,
-                'body': json.dumps({'error': 'Invalid mode'})
+                'body': orjson.dumps({'error': 'Invalid mode'}).decode()
             }
         
         return {
@@ -893,19 +1237,18 @@ def lambda_handler(event, context):
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps({
+            'body': orjson.dumps({
                 'session_id': session_id,
                 'mode': mode,
                 'result': result
-            }, default=decimal_default)
+            }, default=decimal_default).decode()
         }
         
     except Exception as e:
-        print(f"Error: {e}")
         import traceback
-        traceback.print_exc()
+        log_json(logging.ERROR, "Unhandled error", error=str(e), traceback=traceback.format_exc())
         
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': str(e)})
+            'body': orjson.dumps({'error': str(e)}).decode()
         }
@@ -8,19 +8,30 @@ import sys
 import uuid
 import boto3
 
+cfn = boto3.client('cloudformation')
+
+# Pooled HTTP session shared by the tests so each call reuses the connection
+http_session = requests.Session()
+http_session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+# Looked up once and shared by every test below
+_api_endpoint = None
+
 def get_api_endpoint():
     """Get API endpoint from CloudFormation"""
-    cfn = boto3.client('cloudformation')
-    response = cfn.describe_stacks(StackName='DomainFlowDemo')
-    outputs = {o['OutputKey']: o['OutputValue'] for o in response['Stacks'][0]['Outputs']}
-    return outputs['ApiEndpoint']
+    global _api_endpoint
+    if _api_endpoint is None:
+        response = cfn.describe_stacks(StackName='DomainFlowDemo')
+        outputs = {o['OutputKey']: o['OutputValue'] for o in response['Stacks'][0]['Outputs']}
+        _api_endpoint = outputs['ApiEndpoint']
+    return _api_endpoint
 
 def test_ingestion_vague():
     """Test ingestion with vague location"""
     print("\n=== Test 1: Ingestion with vague location ===")
     
     api_url = get_api_endpoint()
-    response = requests.post(
+    response = http_session.post(
         f"{api_url}orchestrate",
         json={
             "mode": "ingestion",
@@ -41,7 +52,7 @@ def test_ingestion_clarification():
     session_id = str(uuid.uuid4())
     
     # First message
-    response1 = requests.post(
+    response1 = http_session.post(
         f"{api_url}orchestrate",
         json={
             "mode": "ingestion",
@@ -58,7 +69,7 @@ def test_ingestion_clarification():
     if data1['result'].get('needs_clarification'):
         print("\nAgent needs clarification, providing details...")
         
-        response2 = requests.post(
+        response2 = http_session.post(
             f"{api_url}orchestrate",
             json={
                 "mode": "ingestion",
@@ -84,7 +95,7 @@ def test_query():
     print("\n=== Test 3: Query mode ===")
     
     api_url = get_api_endpoint()
-    response = requests.post(
+    response = http_session.post(
         f"{api_url}orchestrate",
         json={
             "mode": "query",
@@ -104,7 +115,7 @@ def test_management():
     api_url = get_api_endpoint()
     
     # First get a report ID
-    reports_response = requests.get(f"{api_url}reports")
+    reports_response = http_session.get(f"{api_url}reports")
     reports = reports_response.json()
     
     if not reports.get('reports'):
@@ -114,7 +125,7 @@ def test_management():
     report_id = reports['reports'][0]['report_id']
     print(f"Using report ID: {report_id}")
     
-    response = requests.post(
+    response = http_session.post(
         f"{api_url}orchestrate",
         json={
             "mode": "management",
@@ -133,7 +144,7 @@ def test_list_reports():
     print("\n=== Test 5: List all reports ===")
     
     api_url = get_api_endpoint()
-    response = requests.get(f"{api_url}reports")
+    response = http_session.get(f"{api_url}reports")
     
     data = response.json()
     print(f"Found {len(data.get('reports', []))} reports")
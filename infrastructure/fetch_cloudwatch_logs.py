@@ -2,6 +2,8 @@
 """Fetch CloudWatch logs for failed Lambda functions"""
 import boto3
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # Initialize CloudWatch Logs client
@@ -15,68 +17,48 @@ lambda_functions = [
     'MultiAgentOrchestration-dev-Orchestration-QueryHandler'
 ]
 
-def fetch_recent_logs(function_name, minutes=30):
-    """Fetch recent logs for a Lambda function"""
+def fetch_recent_logs(function_name, minutes=30, max_events=20):
+    """Fetch recent logs for a Lambda function, returned as printable text"""
     log_group = f'/aws/lambda/{function_name}'
+    start_time = int((datetime.now() - timedelta(minutes=minutes)).timestamp() * 1000)
+    
+    lines = [f"\n{'='*80}", f"Function: {function_name}"]
     
     try:
-        # Get log streams
-        response = logs_client.describe_log_streams(
-            logGroupName=log_group,
-            orderBy='LastEventTime',
-            descending=True,
-            limit=5
-        )
+        # filter_log_events searches every stream in the group at once, so
+        # concurrent invocations logging to parallel streams are not missed.
+        # Events come back oldest first; keep only the newest max_events.
+        paginator = logs_client.get_paginator('filter_log_events')
+        events = deque(maxlen=max_events)
+        for page in paginator.paginate(logGroupName=log_group, startTime=start_time):
+            events.extend(page['events'])
         
-        if not response['logStreams']:
-            print(f"\n{'='*80}")
-            print(f"Function: {function_name}")
-            print(f"No log streams found")
-            return
+        if not events:
+            lines.append(f"No log events in the last {minutes} minutes")
+            return "\n".join(lines)
         
-        print(f"\n{'='*80}")
-        print(f"Function: {function_name}")
-        print(f"{'='*80}")
+        lines.append(f"{'='*80}")
         
-        # Get events from the most recent stream
-        for stream in response['logStreams'][:2]:  # Check last 2 streams
-            stream_name = stream['logStreamName']
-            print(f"\nLog Stream: {stream_name}")
-            print(f"{'-'*80}")
-            
-            try:
-                events_response = logs_client.get_log_events(
-                    logGroupName=log_group,
-                    logStreamName=stream_name,
-                    limit=50,
-                    startFromHead=False
-                )
-                
-                events = events_response['events']
-                if not events:
-                    print("No events in this stream")
-                    continue
-                
-                # Print last 20 events
-                for event in events[-20:]:
-                    timestamp = datetime.fromtimestamp(event['timestamp'] / 1000)
-                    message = event['message'].strip()
-                    print(f"[{timestamp}] {message}")
-                    
-            except Exception as e:
-                print(f"Error fetching events: {str(e)}")
+        for event in events:
+            timestamp = datetime.fromtimestamp(event['timestamp'] / 1000)
+            message = event['message'].strip()
+            lines.append(f"[{timestamp}] [{event['logStreamName']}] {message}")
                 
     except Exception as e:
-        print(f"\n{'='*80}")
-        print(f"Function: {function_name}")
-        print(f"Error: {str(e)}")
+        lines.append(f"Error: {str(e)}")
+    
+    return "\n".join(lines)
 
 # Fetch logs for each function
 print("CLOUDWATCH LOGS FOR FAILED LAMBDA FUNCTIONS")
 print("="*80)
 
-for function_name in lambda_functions:
-    fetch_recent_logs(function_name)
+# The log groups are independent, so query them concurrently. Each call
+# returns its output as text and map() yields results in list order, so
+# the report still prints function by function.
+with ThreadPoolExecutor(max_workers=len(lambda_functions)) as executor:
+    for output in executor.map(fetch_recent_logs, lambda_functions):
+        print(output)
 
 print(f"\n{'='*80}")
 print("Log fetch completed")
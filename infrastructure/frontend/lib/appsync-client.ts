@@ -3,8 +3,8 @@ import { generateClient } from 'aws-amplify/api';
 export const appsyncClient = generateClient();
 
 export const STATUS_UPDATE_SUBSCRIPTION = `
-  subscription OnStatusUpdate($userId: ID!) {
-    onStatusUpdate(userId: $userId) {
+  subscription OnStatusUpdate($userId: ID!, $jobId: ID) {
+    onStatusUpdate(userId: $userId, jobId: $jobId) {
       jobId
       agentName
       status
@@ -29,7 +29,8 @@ export interface SubscriptionHandle {
 
 /**
  * Subscribe to status updates for a specific user
- * Filters updates by jobId if provided
+ * Filters updates by jobId if provided (server-side via the subscription
+ * argument, so AppSync does not deliver other jobs' updates)
  */
 export const subscribeToStatusUpdates = (
   userId: string,
@@ -40,7 +41,7 @@ export const subscribeToStatusUpdates = (
   try {
     const subscription = appsyncClient.graphql({
       query: STATUS_UPDATE_SUBSCRIPTION,
-      variables: { userId },
+      variables: jobIdFilter ? { userId, jobId: jobIdFilter } : { userId },
     }) as any;
 
     if (subscription.subscribe) {
@@ -54,14 +55,19 @@ export const subscribeToStatusUpdates = (
               return;
             }
             
-            // Parse confidence from message if present
-            try {
-              const messageData = JSON.parse(update.message);
-              if (messageData.confidence !== undefined) {
-                update.confidence = messageData.confidence;
+            // Parse confidence from message if present. Most messages are
+            // plain text, so skip JSON.parse (and its throw) unless the
+            // message looks like a JSON object.
+            const message = update.message;
+            if (typeof message === 'string' && message.charCodeAt(0) === 123 /* { */) {
+              try {
+                const messageData = JSON.parse(message);
+                if (messageData.confidence !== undefined) {
+                  update.confidence = messageData.confidence;
+                }
+              } catch (e) {
+                // Message is not JSON, ignore
               }
-            } catch (e) {
-              // Message is not JSON, ignore
             }
             
             onUpdate(update);
@@ -17,8 +17,10 @@ REGION = os.environ.get('REGION', os.environ.get('AWS_REGION', 'us-east-1'))
 # Cognito JWKS URL
 JWKS_URL = f'https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}/.well-known/jwks.json'
 
-# Initialize JWKS client
-jwks_client = PyJWKClient(JWKS_URL)
+# Initialize JWKS client. Cognito signing keys rotate rarely, so keep the key
+# set and resolved keys for the life of a warm container (refreshed daily)
+# instead of refetching the JWKS every five minutes.
+jwks_client = PyJWKClient(JWKS_URL, cache_keys=True, lifespan=86400)
 
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -197,7 +197,7 @@ def handler(event, context):
 def trigger_orchestrator(payload: dict):
     """
     Trigger orchestrator to process the job
-    Try multiple methods: SQS, Lambda async, or direct invoke
+    Try SQS first, then an async Lambda invoke
     """
 
     # Method 1: Try SQS queue (best for async processing)
@@ -212,7 +212,9 @@ def trigger_orchestrator(payload: dict):
         except Exception as e:
             print(f"SQS send failed: {e}, trying Lambda invoke...")
 
-    # Method 2: Try async Lambda invocation
+    # Method 2: Async Lambda invocation. There is deliberately no synchronous
+    # fallback: a RequestResponse invoke would block this API handler on the
+    # whole orchestration run, far past the API Gateway timeout.
     try:
         lambda_client.invoke(
             FunctionName=ORCHESTRATOR_FUNCTION,
@@ -220,20 +222,6 @@ def trigger_orchestrator(payload: dict):
             Payload=json.dumps(payload),
         )
         print(f"Triggered orchestrator Lambda async for job {payload['job_id']}")
-        return
-    except Exception as e:
-        print(f"Lambda async invoke failed: {e}, trying sync invoke...")
-
-    # Method 3: Fallback to sync invoke (not ideal but works)
-    try:
-        response = lambda_client.invoke(
-            FunctionName=ORCHESTRATOR_FUNCTION,
-            InvocationType="RequestResponse",  # Sync
-            Payload=json.dumps(payload),
-        )
-        print(f"Triggered orchestrator Lambda sync for job {payload['job_id']}")
-        result = json.loads(response["Payload"].read())
-        print(f"Orchestrator response: {result}")
     except Exception as e:
         print(f"Failed to trigger orchestrator: {e}")
         print("Job will remain in 'processing' status")
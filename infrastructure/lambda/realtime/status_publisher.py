@@ -7,7 +7,12 @@ and publishes to AppSync via GraphQL mutation.
 
 import json
 import os
+import random
+import time
 import boto3
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.config import Config
 from datetime import datetime
 from typing import Dict, Any, Optional
 import logging
@@ -16,8 +21,8 @@ import logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
+# Initialize AWS clients (module level, reused across warm invocations)
+dynamodb = boto3.resource('dynamodb', config=Config(tcp_keepalive=True))
 appsync_client = boto3.client('appsync')
 
 # Environment variables
@@ -28,6 +33,79 @@ APPSYNC_API_ID = os.environ['APPSYNC_API_ID']
 # DynamoDB table
 sessions_table = dynamodb.Table(USER_SESSIONS_TABLE)
 
+# Connection lookup cache: (user_id, tenant_id) -> (connection_id, expires_at).
+# A job publishes ~15 updates to the same user, and connection_id rarely
+# changes mid-job, so warm invocations skip the UserSessions query.
+CONNECTION_CACHE_TTL_SECONDS = 120
+CONNECTION_CACHE_MAX_SIZE = 10000
+_connection_cache: Dict[tuple, tuple] = {}
+
+# GraphQL mutation is static; only the variables change per publish
+PUBLISH_STATUS_MUTATION = """
+mutation PublishStatus(
+    $jobId: ID!,
+    $userId: ID!,
+    $agentName: String,
+    $status: String!,
+    $message: String!,
+    $metadata: AWSJSON
+) {
+    publishStatus(
+        jobId: $jobId,
+        userId: $userId,
+        agentName: $agentName,
+        status: $status,
+        message: $message,
+        metadata: $metadata
+    ) {
+        jobId
+        userId
+        agentName
+        status
+        message
+        timestamp
+    }
+}
+"""
+
+APPSYNC_HEADERS = {
+    'Content-Type': 'application/json',
+}
+
+# SigV4 signer for AppSync (credentials and region resolved once per container
+# instead of building a new boto3 Session on every publish)
+appsync_signer = SigV4Auth(
+    boto3.Session().get_credentials(),
+    'appsync',
+    os.environ['AWS_REGION']
+)
+
+# Retry policy for transient AppSync failures (exponential backoff + jitter)
+APPSYNC_MAX_ATTEMPTS = 3
+APPSYNC_RETRY_BASE_DELAY = 0.2
+APPSYNC_RETRY_MAX_DELAY = 2.0
+APPSYNC_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# HTTP session (reuse across invocations to keep the AppSync connection alive)
+_http_session = None
+
+
+def get_http_session():
+    """
+    Get or create the HTTP session used for AppSync requests.
+    Reusing one session lets warm invocations skip the TCP/TLS handshake.
+    
+    Returns:
+        requests.Session: Shared HTTP session
+    """
+    global _http_session
+    
+    if _http_session is None:
+        import requests
+        _http_session = requests.Session()
+    
+    return _http_session
+
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -45,7 +123,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     }
     """
     try:
-        logger.info(f"Received status update: {json.dumps(event)}")
+        # Only serialize the full event when debug logging is on; a single
+        # INFO line is written per update once it has been published.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received status update: %s", json.dumps(event))
         
         # Extract required fields
         job_id = event.get('job_id')
@@ -74,16 +155,21 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             }
         
         # Publish to AppSync
-        publish_result = publish_to_appsync(
-            job_id=job_id,
-            user_id=user_id,
-            agent_name=agent_name,
-            status=status,
-            message=message,
-            metadata=metadata
-        )
+        try:
+            publish_result = publish_to_appsync(
+                job_id=job_id,
+                user_id=user_id,
+                agent_name=agent_name,
+                status=status,
+                message=message,
+                metadata=metadata
+            )
+        except Exception:
+            # Connection may be stale; force a fresh lookup next time
+            _connection_cache.pop((user_id, tenant_id), None)
+            raise
         
-        logger.info(f"Successfully published status update for job {job_id}")
+        logger.info("Published status update job=%s status=%s agent=%s", job_id, status, agent_name)
         
         return {
             'statusCode': 200,
@@ -111,6 +197,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 def get_user_connection(user_id: str, tenant_id: str) -> Optional[str]:
     """
     Look up user's active connection_id from DynamoDB.
+    Results are cached in-process for CONNECTION_CACHE_TTL_SECONDS.
     
     Args:
         user_id: User identifier
@@ -119,6 +206,11 @@ def get_user_connection(user_id: str, tenant_id: str) -> Optional[str]:
     Returns:
         connection_id if found, None otherwise
     """
+    cache_key = (user_id, tenant_id)
+    cached = _connection_cache.get(cache_key)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    
     try:
         # Query for active sessions
         response = sessions_table.query(
@@ -136,9 +228,19 @@ def get_user_connection(user_id: str, tenant_id: str) -> Optional[str]:
         
         if items:
             connection_id = items[0].get('connection_id')
-            logger.info(f"Found connection_id {connection_id} for user {user_id}")
+            logger.debug("Found connection_id %s for user %s", connection_id, user_id)
+            
+            # Only positive lookups are cached so a user who connects
+            # later is picked up on the next status update
+            if len(_connection_cache) >= CONNECTION_CACHE_MAX_SIZE:
+                _connection_cache.clear()
+            _connection_cache[cache_key] = (
+                connection_id,
+                time.monotonic() + CONNECTION_CACHE_TTL_SECONDS
+            )
             return connection_id
         
+        _connection_cache.pop(cache_key, None)
         return None
         
     except Exception as e:
@@ -168,82 +270,36 @@ def publish_to_appsync(
     Returns:
         AppSync response
     """
-    # Build GraphQL mutation
-    mutation = """
-    mutation PublishStatus(
-        $jobId: ID!,
-        $userId: ID!,
-        $agentName: String,
-        $status: String!,
-        $message: String!,
-        $metadata: AWSJSON
-    ) {
-        publishStatus(
-            jobId: $jobId,
-            userId: $userId,
-            agentName: $agentName,
-            status: $status,
-            message: $message,
-            metadata: $metadata
-        ) {
-            jobId
-            userId
-            agentName
-            status
-            message
-            timestamp
-        }
-    }
-    """
-    
     variables = {
         'jobId': job_id,
         'userId': user_id,
         'agentName': agent_name,
         'status': status,
         'message': message,
-        'metadata': json.dumps(metadata) if metadata else None
+        'metadata': json.dumps(metadata, separators=(',', ':')) if metadata else None
     }
     
     try:
         # Use AWS SDK to execute GraphQL mutation
         # Note: This requires IAM authentication
-        import requests
-        from botocore.auth import SigV4Auth
-        from botocore.awsrequest import AWSRequest
-        
-        # Prepare request
-        headers = {
-            'Content-Type': 'application/json',
-        }
-        
         body = json.dumps({
-            'query': mutation,
+            'query': PUBLISH_STATUS_MUTATION,
             'variables': variables
-        })
+        }, separators=(',', ':'))
         
         # Create AWS request for signing
         request = AWSRequest(
             method='POST',
             url=APPSYNC_API_URL,
             data=body,
-            headers=headers
+            headers=dict(APPSYNC_HEADERS)
         )
         
         # Sign request with SigV4
-        SigV4Auth(
-            boto3.Session().get_credentials(),
-            'appsync',
-            os.environ['AWS_REGION']
-        ).add_auth(request)
+        appsync_signer.add_auth(request)
         
         # Execute request
-        response = requests.post(
-            APPSYNC_API_URL,
-            headers=dict(request.headers),
-            data=body,
-            timeout=10
-        )
+        response = post_with_retry(dict(request.headers), body)
         
         response.raise_for_status()
         result = response.json()
@@ -257,3 +313,38 @@ def publish_to_appsync(
     except Exception as e:
         logger.error(f"Error publishing to AppSync: {str(e)}")
         raise
+
+
+def post_with_retry(headers: Dict[str, str], body: str):
+    """
+    POST a signed request to AppSync, retrying connection errors and
+    throttling/5xx responses with exponential backoff and jitter.
+    
+    Args:
+        headers: Signed request headers
+        body: JSON request body
+        
+    Returns:
+        requests.Response from the last attempt
+    """
+    import requests
+    
+    for attempt in range(APPSYNC_MAX_ATTEMPTS):
+        last_attempt = attempt == APPSYNC_MAX_ATTEMPTS - 1
+        try:
+            response = get_http_session().post(
+                APPSYNC_API_URL,
+                headers=headers,
+                data=body,
+                timeout=10
+            )
+            if response.status_code not in APPSYNC_RETRY_STATUS_CODES or last_attempt:
+                return response
+            logger.warning(f"AppSync returned {response.status_code}, retrying")
+        except requests.exceptions.ConnectionError as e:
+            if last_attempt:
+                raise
+            logger.warning(f"AppSync connection error, retrying: {str(e)}")
+        
+        delay = min(APPSYNC_RETRY_MAX_DELAY, APPSYNC_RETRY_BASE_DELAY * 2 ** attempt)
+        time.sleep(delay + random.uniform(0, APPSYNC_RETRY_BASE_DELAY))
@@ -7,13 +7,26 @@ Helper functions for publishing status updates from orchestrator and agents.
 import json
 import os
 import boto3
+from botocore.config import Config
 from typing import Dict, Any, Optional
 import logging
 
 logger = logging.getLogger()
 
-# Initialize Lambda client for invoking status publisher
-lambda_client = boto3.client('lambda')
+# Initialize Lambda client for invoking status publisher (module level so
+# warm invocations reuse the client and its kept-alive connections).
+# Event invocations return 202 almost immediately, so tight timeouts keep a
+# slow Lambda endpoint from stalling the orchestrator for the 60s default.
+lambda_client = boto3.client(
+    'lambda',
+    config=Config(
+        tcp_keepalive=True,
+        max_pool_connections=50,
+        connect_timeout=2,
+        read_timeout=5,
+        retries={'mode': 'adaptive', 'max_attempts': 2}
+    )
+)
 
 # Environment variable for status publisher function
 STATUS_PUBLISHER_FUNCTION = os.environ.get('STATUS_PUBLISHER_FUNCTION')
@@ -58,7 +71,7 @@ def publish_status(
             'metadata': metadata or {}
         }
         
-        logger.info(f"Publishing status: {status} - {message}")
+        logger.debug("Publishing status: %s - %s", status, message)
         
         # Invoke status publisher asynchronously
         response = lambda_client.invoke(
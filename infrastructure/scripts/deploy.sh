@@ -162,6 +162,11 @@ initialize_database() {
         return
     fi
     
+    # Returns as soon as the function is Active rather than sleeping a fixed time
+    aws lambda wait function-active-v2 \
+        --function-name $DB_INIT_FUNCTION \
+        --region $AWS_REGION
+    
     log_info "Invoking database initialization: $DB_INIT_FUNCTION"
     aws lambda invoke \
         --function-name $DB_INIT_FUNCTION \
@@ -339,9 +344,6 @@ main() {
     bootstrap_cdk
     deploy_stacks
     
-    log_info "Waiting 30 seconds for resources to stabilize..."
-    sleep 30
-    
     initialize_database
     initialize_opensearch
     create_test_user
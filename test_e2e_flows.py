@@ -17,6 +17,11 @@ AWS_REGION = os.environ.get("AWS_REGION", "us-east-1")
 TEST_USERNAME = os.environ.get("TEST_USERNAME", "testuser")
 TEST_PASSWORD = os.environ.get("TEST_PASSWORD", "TestPassword123!")
 
+# One pooled HTTP session for every API call so polling loops reuse the
+# TCP/TLS connection instead of handshaking per request
+http_session = requests.Session()
+http_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
 class Colors:
     GREEN = '\033[92m'
     RED = '\033[91m'
@@ -82,13 +87,13 @@ class E2EFlowTester:
         
         try:
             if method == "GET":
-                response = requests.get(url, headers=headers, timeout=30)
+                response = http_session.get(url, headers=headers, timeout=30)
             elif method == "POST":
-                response = requests.post(url, headers=headers, json=data, timeout=30)
+                response = http_session.post(url, headers=headers, json=data, timeout=30)
             elif method == "PUT":
-                response = requests.put(url, headers=headers, json=data, timeout=30)
+                response = http_session.put(url, headers=headers, json=data, timeout=30)
             elif method == "DELETE":
-                response = requests.delete(url, headers=headers, timeout=30)
+                response = http_session.delete(url, headers=headers, timeout=30)
             
             if expected_status and response.status_code != expected_status:
                 print_error(f"Expected {expected_status}, got {response.status_code}")
@@ -6,32 +6,39 @@ import json
 import boto3
 import os
 
+# Clients and stack outputs are built once per process and reused by every
+# lookup below instead of each helper creating its own
+_clients = {}
+_stack_outputs = None
+
+def get_client(service):
+    """Return a cached boto3 client for service."""
+    client = _clients.get(service)
+    if client is None:
+        client = _clients[service] = boto3.client(service)
+    return client
+
+def get_stack_outputs():
+    """Return the Data stack's CloudFormation outputs, fetched once."""
+    global _stack_outputs
+    if _stack_outputs is None:
+        response = get_client('cloudformation').describe_stacks(StackName='MultiAgentOrchestration-dev-Data')
+        _stack_outputs = {o['OutputKey']: o['OutputValue'] for o in response['Stacks'][0]['Outputs']}
+    return _stack_outputs
+
 def get_db_credentials():
     """Get database credentials from Secrets Manager."""
     secret_arn = os.environ.get('DB_SECRET_ARN')
     if not secret_arn:
         # Get from CloudFormation outputs
-        cfn = boto3.client('cloudformation')
-        response = cfn.describe_stacks(StackName='MultiAgentOrchestration-dev-Data')
-        outputs = response['Stacks'][0]['Outputs']
-        for output in outputs:
-            if output['OutputKey'] == 'DatabaseSecretArn':
-                secret_arn = output['OutputValue']
-                break
+        secret_arn = get_stack_outputs().get('DatabaseSecretArn')
     
-    secrets = boto3.client('secretsmanager')
-    response = secrets.get_secret_value(SecretId=secret_arn)
+    response = get_client('secretsmanager').get_secret_value(SecretId=secret_arn)
     return json.loads(response['SecretString'])
 
 def get_db_endpoint():
     """Get database endpoint from CloudFormation outputs."""
-    cfn = boto3.client('cloudformation')
-    response = cfn.describe_stacks(StackName='MultiAgentOrchestration-dev-Data')
-    outputs = response['Stacks'][0]['Outputs']
-    for output in outputs:
-        if output['OutputKey'] == 'DatabaseEndpoint':
-            return output['OutputValue']
-    return None
+    return get_stack_outputs().get('DatabaseEndpoint')
 
 def query_database():
     """Query database to verify data."""